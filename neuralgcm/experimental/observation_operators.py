@@ -15,7 +15,9 @@
 """Defines observation operator API and sample operators for NeuralGCM."""
 
 import abc
+from collections.abc import Mapping
 import dataclasses
+import types
 from flax import nnx
 import jax
 import jax.numpy as jnp
@@ -45,10 +47,30 @@ class DataObservationOperator(ObservationOperator):
   operator requires that all `query` entries are of `coordax.Coordinate` type.
 
   Attributes:
-    fields: A dictionary of `coordax.Field`s to return in the observation.
+    fields: A mapping of `coordax.Field`s to return in the observation,
+      wrapped into a read-only view at construction time.
   """
 
-  fields: dict[str, cx.Field]
+  fields: Mapping[str, cx.Field]
+
+  def __post_init__(self):
+    self.fields = types.MappingProxyType(dict(self.fields))
+    self._keys = frozenset(self.fields)
+    # Structure-of-arrays views of `fields`: query validation touches only
+    # the small coordinate dict while assembly reads the data dict.
+    # Coordinates are extracted lazily because fields with plain named
+    # dimensions carry no coordinate to extract.
+    self._data = {k: v.data for k, v in self.fields.items()}
+    self._coords = {}
+    self._validated_queries = set()
+
+  def _field_coord(self, k: str) -> cx.Coordinate:
+    """Returns the (cached) coordinate of the field stored under `k`."""
+    coord = self._coords.get(k)
+    if coord is None:
+      coord = cx.get_coordinate(self.fields[k])
+      self._coords[k] = coord
+    return coord
 
   def observe(
       self,
@@ -57,21 +79,38 @@ class DataObservationOperator(ObservationOperator):
   ) -> dict[str, cx.Field]:
     """Returns observations for `query` matched against `self.fields`."""
     del inputs  # unused.
-    observations = {}
-    is_coordinate = lambda x: isinstance(x, cx.Coordinate)
-    valid_keys = list(self.fields.keys())
-    for k, v in query.items():
-      if k not in valid_keys:
-        raise ValueError(f'Query contains {k=} not in {valid_keys}')
-      if not is_coordinate(v):
-        raise ValueError(
-            f'DataObservationOperator only supports coordinate queries, got {v}'
-        )
-      coord = cx.get_coordinate(self.fields[k])
-      if v != coord:
-        raise ValueError(f'Query ({k}, {v}) does not match field.{coord=}')
-      observations[k] = self.fields[k]
-    return observations
+    try:
+      query_signature = frozenset(query.items())
+    except TypeError:
+      query_signature = None  # unhashable entries are rejected below.
+    if query_signature in self._validated_queries:
+      return {k: cx.wrap(self._data[k], self._coords[k]) for k in query}
+    missing = [k for k in query if k not in self._keys]
+    if missing:
+      k = missing[0]
+      raise ValueError(f'Query contains {k=} not in {list(self.fields)}')
+    non_coordinates = [
+        v for v in query.values() if not isinstance(v, cx.Coordinate)
+    ]
+    if non_coordinates:
+      raise ValueError(
+          'DataObservationOperator only supports coordinate queries, got'
+          f' {non_coordinates[0]}'
+      )
+    # Identity check first: queries typically reuse the same coordinate
+    # objects, which skips the structural __eq__ comparison.
+    mismatched = [
+        (k, v)
+        for k, v in query.items()
+        if v is not self._field_coord(k) and v != self._field_coord(k)
+    ]
+    if mismatched:
+      k, v = mismatched[0]
+      coord = self._coords[k]
+      raise ValueError(f'Query ({k}, {v}) does not match field.{coord=}')
+    if query_signature is not None:
+      self._validated_queries.add(query_signature)
+    return {k: cx.wrap(self._data[k], self._coords[k]) for k in query}
 
 
 @dataclasses.dataclass
@@ -96,14 +135,12 @@ class FixedLearnedObservationOperator(ObservationOperator):
         k: jnp.squeeze(v, axis=0) if v.shape[0] == 1 else v
         for k, v in predictions.items()
     }
-    is_coordinate = lambda x: isinstance(x, cx.Coordinate)
-    prediction_keys = list(predictions.keys())
     observations = {}
     coord = self.coordinate_mapping.coords
     for k, v in query.items():
-      if k not in prediction_keys:
-        raise ValueError(f'Query contains {k=} not in {prediction_keys}')
-      if not is_coordinate(v):
+      if k not in predictions:
+        raise ValueError(f'Query contains {k=} not in {list(predictions)}')
+      if not isinstance(v, cx.Coordinate):
         raise ValueError(
             'FixedLearnedObservationOperator only supports coordinate queries,'
             f' got {v}'
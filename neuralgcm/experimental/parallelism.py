@@ -101,24 +101,51 @@ class Mesh:
 
   def __post_init__(self):
     self._validate_partitions()
+    # Cache of resolved partition specs, keyed by (schema, field dims). Since
+    # Mesh is a frozen dataclass, the cache is attached via object.__setattr__.
+    object.__setattr__(self, '_partition_spec_cache', {})
+    array_shardings = {}
+    if self.spmd_mesh is not None:
+      for schema, spec in self.array_partitions.items():
+        array_shardings[schema] = jax.sharding.NamedSharding(
+            self.spmd_mesh, P(*spec)
+        )
+    object.__setattr__(self, '_array_shardings', array_shardings)
+
+  def _partition_spec(
+      self, schema: str, dims: tuple[str, ...] | None = None
+  ) -> P:
+    """Returns a cached PartitionSpec for `schema` (and field `dims`)."""
+    key = (schema, dims)
+    spec = self._partition_spec_cache.get(key)
+    if spec is None:
+      if dims is None:
+        spec = P(*self.array_partitions[schema])
+      else:
+        dim_partitions = self.field_partitions[schema]
+        spec = P(*[dim_partitions.get(d, None) for d in dims])
+      self._partition_spec_cache[key] = spec
+    return spec
 
   def _validate_partitions(self):
     """Validates that partitioning options are compatible with the mesh."""
-    if self.spmd_mesh is not None:
-      for k, v in self.array_partitions.items():
-        partition_axes = jax.tree.leaves(v)
-        if not set(partition_axes).issubset(set(self.axis_names)):
-          raise ValueError(f'Spec {k, v} use axes not in {self.axis_names}')
-        if np.unique(partition_axes).size != len(partition_axes):
-          raise ValueError(f'Encountered duplicate in spec {k, v}')
-
-      for _, dim_partitions in self.field_partitions.items():
-        for k, v in dim_partitions.items():
-          partition_axes = jax.tree.leaves(v)
-          if not set(partition_axes).issubset(set(self.axis_names)):
-            raise ValueError(f'Spec {k, v} use axes not in {self.axis_names}')
-          if np.unique(partition_axes).size != len(partition_axes):
-            raise ValueError(f'Encountered duplicate in spec {k, v}')
+    if self.spmd_mesh is None:
+      return
+    axis_set = frozenset(self.axis_names)
+
+    def check_spec(k, v):
+      partition_axes = jax.tree.leaves(v)
+      if any(axis not in axis_set for axis in partition_axes):
+        raise ValueError(f'Spec {k, v} use axes not in {self.axis_names}')
+      counts = collections.Counter(partition_axes)
+      if any(count > 1 for count in counts.values()):
+        raise ValueError(f'Encountered duplicate in spec {k, v}')
+
+    for k, v in self.array_partitions.items():
+      check_spec(k, v)
+    for dim_partitions in self.field_partitions.values():
+      for k, v in dim_partitions.items():
+        check_spec(k, v)
 
   @property
   def shape(self) -> collections.OrderedDict[str, int]:
@@ -142,54 +169,35 @@ class Mesh:
 
     is_field = lambda x: isinstance(x, cx.Field)
     all_leaves, tree_def = jax.tree.flatten(inputs, is_leaf=is_field)
-    array_leaves = [x for x in all_leaves if not is_field(x)]
-    if np.unique([x.ndim for x in array_leaves]).size > 1:
+    ranks = {x.ndim for x in all_leaves if not is_field(x)}
+    if len(ranks) > 1:
       raise ValueError(
           'All arrays in the pytree must have the same rank. Got:'
-          f' {[x.ndim for x in array_leaves]=}'
+          f' {sorted(ranks)}'
       )
     if self.spmd_mesh is None:
       return inputs
-    leaves = []
-    for x in all_leaves:
-      if is_field(x):
-        leaves.append(self._with_sharding_constraint_field(x, schema))
-      else:
-        leaves.append(self._with_sharding_constraint_array(x, schema))
+    # Normalize cx.Field leaves to their raw arrays so all constraints are
+    # applied in a single with_sharding_constraint call, then re-wrap.
+    shardings = [
+        self._leaf_sharding(x, schema, is_field(x)) for x in all_leaves
+    ]
+    data_leaves = [x.data if is_field(x) else x for x in all_leaves]
+    constrained = jax.lax.with_sharding_constraint(data_leaves, shardings)
+    leaves = [
+        cx.Field(y, x.dims, x.axes) if is_field(x) else y
+        for x, y in zip(all_leaves, constrained)
+    ]
     return jax.tree.unflatten(tree_def, leaves)
 
-  def _with_sharding_constraint_array(
-      self, array: jax.Array, schema: str
-  ) -> jax.Array:
-    """Applies sharding constraint to `array`.
-
-    Args:
-      array: array to apply sharding constraint to.
-      schema: key in `self.array_partitions` indicating sharding schema.
-
-    Returns:
-      `inputs` with sharding constraint(s) applied.
-    """
-    p_specs = P(*self.array_partitions[schema])
-    sharding = jax.sharding.NamedSharding(self.spmd_mesh, p_specs)
-    return jax.lax.with_sharding_constraint(array, sharding)
-
-  def _with_sharding_constraint_field(
-      self, field: cx.Field, schema: str
-  ) -> cx.Field:
-    """Applies sharding constraint to `field`.
-
-    Args:
-      field: field to apply sharding constraint to.
-      schema: key in `self.field_partitions` indicating sharding schema.
-
-    Returns:
-      Field with sharding constraint applied.
-    """
-    dim_partitions = self.field_partitions[schema]
-    p_specs = partition_spec_for_field(field, dim_partitions)
-    sharding = jax.sharding.NamedSharding(self.spmd_mesh, p_specs)
-    return jax.lax.with_sharding_constraint(field, sharding)
+  def _leaf_sharding(
+      self, leaf: cx.Field | jax.Array, schema: str, leaf_is_field: bool
+  ) -> jax.sharding.NamedSharding:
+    """Returns the sharding that `schema` implies for `leaf`."""
+    if leaf_is_field:
+      p_specs = self._partition_spec(schema, leaf.dims)
+      return jax.sharding.NamedSharding(self.spmd_mesh, p_specs)
+    return self._array_shardings[schema]
 
 
 # TODO(dkochkov): Remove these temporary functions once we can rely on imposing